@@ -1,9 +1,19 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, make_response, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import orjson
 import pandas as pd
 import numpy as np
 import json
 import os
+import base64
+import functools
+import hashlib
+import hmac
+import pickle
+import sys
+import threading
+from collections import defaultdict
 
 # Import analysis pipeline modules
 from services.data_loader import load_data
@@ -23,7 +33,21 @@ from services.congestion_predictor import (
 # Import capacity optimizer (deterministic, SLA-aware)
 from services.capacity_optimizer import optimize_all_links
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson (fast, and serializes NumPy types natively)."""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for frontend
 
 # Path to traffic data (directory with raw .dat files)
@@ -32,30 +56,225 @@ FEATURES_PATH = "data/congestion_features_v2.csv"
 METRICS_PATH = "data/model_metrics.json"
 IMPORTANCE_PATH = "data/feature_importance.json"
 
+# On-disk snapshot of the analysis pipeline (opt-in, keyed by DATA_PATH fingerprint)
+ANALYSIS_CACHE_PATH = "data/.analysis_cache.pkl"
+ANALYSIS_CACHE_VERSION = 9  # Bump when the structure of the cached analysis changes
+ANALYSIS_CACHE_ENABLED = os.environ.get("ANALYSIS_CACHE") == "1"
+
+# Compute the analysis in a background thread at startup instead of on the first request
+WARM_CACHE = os.environ.get("WARM_CACHE") == "1"
+
+# Compute the analysis synchronously at import; under gunicorn --preload the
+# forked workers then share the master's copy instead of each computing their own
+PRELOAD_CACHE = os.environ.get("PRELOAD_CACHE") == "1"
+
+# Shared secret for the /admin endpoints (sent as X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
 # Constants
 SLOT_DURATION_SECONDS = 500e-6  # 500 microseconds
 
-# Cache for processed data (avoid re-processing on every request)
+# Cache for derived data such as link traffic, each entry stored with the data
+# fingerprint it was built from (the analysis itself is memoized in _analysis_for)
 _cache = {}
 
 # Cache for ML model
 _ml_cache = {}
 
+# Serializes analysis computation so the warm-up thread and requests don't run it twice
+_analysis_lock = threading.Lock()
+
+
+def _fingerprint(data_path):
+    """Hash file names, mtimes and sizes under data_path to detect data changes."""
+    digest = hashlib.sha1(f"{ANALYSIS_CACHE_VERSION}:{data_path}".encode())
+    if os.path.isdir(data_path):
+        entries = sorted((e for e in os.scandir(data_path) if e.is_file()), key=lambda e: e.name)
+        stats = [(e.name, e.stat()) for e in entries]
+    else:
+        stats = [(os.path.basename(data_path), os.stat(data_path))]
+    for name, st in stats:
+        digest.update(f"{name}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return digest.hexdigest()
+
+
+def _load_analysis_snapshot(fingerprint):
+    """Load the pickled analysis from disk if it was built from the same data."""
+    try:
+        with open(ANALYSIS_CACHE_PATH, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[Cache] Ignoring unreadable analysis snapshot: {e}")
+        return None
+    
+    if snapshot.get('fingerprint') != fingerprint:
+        return None
+    return snapshot['analysis']
+
+
+def _save_analysis_snapshot(fingerprint, analysis):
+    """Persist the analysis atomically (write to a temp file, then rename)."""
+    tmp_path = ANALYSIS_CACHE_PATH + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'fingerprint': fingerprint, 'analysis': analysis}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, ANALYSIS_CACHE_PATH)
+    except OSError as e:
+        print(f"[Cache] Could not write analysis snapshot: {e}")
+
+
+@functools.lru_cache(maxsize=1)
+def _analysis_for(fingerprint):
+    """
+    Compute the analysis results for one state of DATA_PATH.
+    
+    Memoized on the data fingerprint, so changed files under DATA_PATH produce a
+    new entry (and evict the stale one). With ANALYSIS_CACHE=1 the results are
+    also persisted to ANALYSIS_CACHE_PATH and reused by fresh processes.
+    """
+    if ANALYSIS_CACHE_ENABLED and fingerprint is not None:
+        analysis = _load_analysis_snapshot(fingerprint)
+        if analysis is not None:
+            print("[Cache] Loaded analysis snapshot from disk")
+            return analysis
+    
+    df = load_data(DATA_PATH)
+    df_with_congestion = detect_congestion(df)
+    correlation_matrix = compute_congestion_correlation(df_with_congestion)
+    topology = infer_topology(correlation_matrix)
+    
+    # Downcast to compact dtypes: the cached frame is scanned by every endpoint,
+    # so fewer bytes per row means faster groupbys and masks. timestamp stays
+    # float64: float32 can't hold 10 µs resolution over the trace, which would
+    # shift 100 ms buckets and merge distinct timestamps in link_peak
+    df_with_congestion['cell_id'] = df_with_congestion['cell_id'].astype('category')
+    df_with_congestion['throughput'] = pd.to_numeric(df_with_congestion['throughput'], downcast='unsigned')
+    df_with_congestion['packet_loss'] = pd.to_numeric(df_with_congestion['packet_loss'], downcast='unsigned')
+    
+    # Keep each cell's rows contiguous and in time order, indexed by cell_id
+    # (sorted index -> per-cell lookups are binary searches, not full scans).
+    # The index is left unnamed so groupby('cell_id') still refers to the column.
+    df_with_congestion = (
+        df_with_congestion.sort_values(['cell_id', 'timestamp'])
+        .set_index('cell_id', drop=False)
+        .rename_axis(None)
+    )
+    
+    # Link assignment per row, shared by the per-link endpoints
+    df_with_congestion['link'] = df_with_congestion['cell_id'].map(topology).astype('category')
+    
+    # Numeric sort keys ("cell_12" -> 12, "Link_3" -> 3), parsed once
+    cell_order = {cell_id: int(cell_id.split('_')[1]) for cell_id in topology}
+    
+    # Topology views shared by the per-cell and per-link endpoints
+    links_to_cells = defaultdict(list)
+    for cell_id, link_name in topology.items():
+        links_to_cells[link_name].append(cell_id)
+    links_to_cells = {
+        link_name: sorted(cells, key=cell_order.__getitem__)
+        for link_name, cells in links_to_cells.items()
+    }
+    link_fanout = {link_name: len(cells) for link_name, cells in links_to_cells.items()}
+    link_to_id = {link_name: int(link_name.split('_')[1]) for link_name in links_to_cells}
+    cell_to_link_id = {cell_id: link_to_id[link_name] for cell_id, link_name in topology.items()}
+    
+    # Peak aggregate throughput per link: per-timestamp sum over the link's cells, then max
+    link_peak = (
+        df_with_congestion.groupby(['link', 'timestamp'], sort=False, observed=True)['throughput'].sum()
+        .groupby(level=0, observed=True).max().to_dict()
+    )
+    
+    # Dense float32 copy of the correlation matrix, rows/columns ordered as
+    # corr_labels. The nested dicts have no self entries, so the diagonal stays 0
+    corr_labels = sorted(correlation_matrix, key=cell_order.__getitem__)
+    corr_matrix = np.zeros((len(corr_labels), len(corr_labels)), dtype=np.float32)
+    for i, cell_a in enumerate(corr_labels):
+        for j, cell_b in enumerate(corr_labels):
+            if i != j:
+                corr_matrix[i, j] = correlation_matrix[cell_a].get(cell_b, 0.0)
+    
+    analysis = {
+        'df': df_with_congestion,
+        'correlation_matrix': correlation_matrix,
+        'topology': topology,
+        'cell_order': cell_order,
+        'links_to_cells': links_to_cells,
+        'link_fanout': link_fanout,
+        'link_to_id': link_to_id,
+        'cell_to_link_id': cell_to_link_id,
+        'link_peak': link_peak,
+        'corr_labels': corr_labels,
+        'corr_matrix': corr_matrix
+    }
+    
+    if ANALYSIS_CACHE_ENABLED and fingerprint is not None:
+        _save_analysis_snapshot(fingerprint, analysis)
+    return analysis
+
+
+def _current_fingerprint():
+    """Fingerprint of the current contents of DATA_PATH, or None if it is missing."""
+    return _fingerprint(DATA_PATH) if os.path.exists(DATA_PATH) else None
+
 
 def get_cached_analysis():
-    """Get or compute cached analysis results."""
-    if 'analysis' not in _cache:
-        df = load_data(DATA_PATH)
-        df_with_congestion = detect_congestion(df)
-        correlation_matrix = compute_congestion_correlation(df_with_congestion)
-        topology = infer_topology(correlation_matrix)
-        
-        _cache['analysis'] = {
-            'df': df_with_congestion,
-            'correlation_matrix': correlation_matrix,
-            'topology': topology
-        }
-    return _cache['analysis']
+    """Get or compute cached analysis results for the current contents of DATA_PATH."""
+    fingerprint = _current_fingerprint()
+    with _analysis_lock:
+        return _analysis_for(fingerprint)
+
+
+def _warm_analysis_cache():
+    """Populate the analysis cache ahead of the first request."""
+    try:
+        get_cached_analysis()
+        print("[Cache] Analysis cache warmed")
+    except Exception as e:
+        print(f"[Cache] Warm-up failed: {e}")
+
+
+def start_cache_warmup():
+    """Warm the analysis cache in a background thread if WARM_CACHE is set."""
+    if WARM_CACHE:
+        threading.Thread(target=_warm_analysis_cache, daemon=True).start()
+
+
+if PRELOAD_CACHE:
+    _warm_analysis_cache()
+elif "gunicorn" not in sys.modules:
+    # Under gunicorn the post_fork hook in gunicorn.conf.py starts the thread in
+    # each worker instead: with --preload this import runs in the master, and a
+    # fork taken mid warm-up would leave the workers with _analysis_lock held
+    # and no thread to release it
+    start_cache_warmup()
+
+
+def etag_cached(view):
+    """
+    Tag responses derived purely from the analysis with the data fingerprint
+    and answer matching If-None-Match requests with 304 Not Modified.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = _current_fingerprint()
+        if etag is None:
+            return view(*args, **kwargs)
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, max-age=60'
+        return response
+    
+    return wrapper
 
 
 def get_ml_model():
@@ -69,7 +288,8 @@ def get_ml_model():
             print("[ML] Computing features from raw data...")
             analysis = get_cached_analysis()
             df_features = engineer_features(
-                analysis['df'].drop(columns=['is_congested']), 
+                analysis['df'].drop(columns=['is_congested', 'link'])
+                    .astype({'cell_id': str}).reset_index(drop=True),
                 topology=analysis['topology'],
                 verbose=True
             )
@@ -155,7 +375,7 @@ def root():
     return jsonify({
         "message": "5G Fronthaul Analysis Backend - Topology Inference + ML Congestion Prediction",
         "endpoints": {
-            "core": ["/health", "/analyze"],
+            "core": ["/health", "/analyze", "/admin/invalidate (POST)"],
             "statistics": ["/api/cell-stats", "/api/link-stats", "/api/correlation", "/api/timeseries/<cell_id>"],
             "ml_prediction": ["/api/predict-congestion", "/api/cell-risk/<cell_id>", "/api/model-info", "/api/feature-importance"],
             "realtime": ["/api/realtime-risk?start=0&window=100", "/api/risk-stream?buckets=50"]
@@ -169,6 +389,38 @@ def health():
     return jsonify({"status": "ok"})
 
 
+@app.route("/admin/invalidate", methods=["POST"])
+def invalidate_cache():
+    """
+    Drop all cached results (analysis, derived data, ML model, features) so the
+    next request recomputes them.
+    
+    Requires ADMIN_TOKEN to be set on the server and sent in the X-Admin-Token
+    header; the endpoint is disabled otherwise.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled"}), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token"}), 403
+    
+    with _analysis_lock:
+        _analysis_for.cache_clear()
+    _cache.clear()
+    _ml_cache.clear()
+    _features_cache['df'] = None
+    _features_cache['timestamps'] = None
+    _traffic_cache['link_traffic_df'] = None
+    _traffic_cache['topology'] = None
+    _traffic_cache['fingerprint'] = None
+    
+    try:
+        os.remove(ANALYSIS_CACHE_PATH)
+    except FileNotFoundError:
+        pass
+    
+    return jsonify({"status": "invalidated"})
+
+
 @app.route("/debug/files")
 def debug_files():
     """Debug endpoint to check data files on server."""
@@ -231,6 +483,7 @@ def analyze():
 
 
 @app.route("/api/cell-stats")
+@etag_cached
 def cell_stats():
     """
     Get statistics for each cell from real data.
@@ -240,37 +493,38 @@ def cell_stats():
         analysis = get_cached_analysis()
         df = analysis['df']
         topology = analysis['topology']
+        cell_to_link_id = analysis['cell_to_link_id']
+        link_fanout = analysis['link_fanout']
+        
+        # Calculate real statistics for all cells in a single groupby pass
+        cell_ids = sorted(df['cell_id'].unique(), key=analysis['cell_order'].__getitem__)
+        agg = df.groupby('cell_id', sort=False, observed=True).agg(
+            avg_throughput=('throughput', 'mean'),
+            peak_throughput=('throughput', 'max'),
+            total_packets=('throughput', 'sum'),
+            total_loss=('packet_loss', 'sum'),
+            congestion_count=('is_congested', 'sum'),
+            total_samples=('throughput', 'size')
+        ).reindex(cell_ids)
+        agg['packet_loss_rate'] = (
+            agg['total_loss'] / agg['total_packets'].replace(0, np.nan) * 100
+        ).fillna(0)
         
         cell_stats = []
-        for cell_id in sorted(df['cell_id'].unique(), key=lambda x: int(x.split('_')[1])):
-            cell_data = df[df['cell_id'] == cell_id]
-            
+        for cell_id, row in agg.to_dict(orient='index').items():
             link_name = topology.get(cell_id, "Unknown")
-            link_id = int(link_name.split('_')[1]) if link_name != "Unknown" else 0
-            
-            # Calculate real statistics
-            avg_throughput = float(cell_data['throughput'].mean())
-            peak_throughput = float(cell_data['throughput'].max())
-            total_packets = int(cell_data['throughput'].sum())
-            total_loss = int(cell_data['packet_loss'].sum())
-            packet_loss_rate = (total_loss / total_packets * 100) if total_packets > 0 else 0
-            congestion_count = int(cell_data['is_congested'].sum())
-            total_samples = len(cell_data)
-            
-            # Determine if isolated (only cell on its link)
-            cells_on_link = [c for c, l in topology.items() if l == link_name]
-            isolated = len(cells_on_link) == 1
+            link_id = cell_to_link_id.get(cell_id, 0)
             
             cell_stats.append({
                 "cellId": cell_id,
                 "linkId": link_id,
                 "linkName": link_name,
-                "avgThroughput": round(avg_throughput, 2),
-                "peakThroughput": round(peak_throughput, 2),
-                "packetLossRate": round(packet_loss_rate, 4),
-                "congestionEvents": congestion_count,
-                "totalSamples": total_samples,
-                "isolated": isolated
+                "avgThroughput": round(float(row['avg_throughput']), 2),
+                "peakThroughput": round(float(row['peak_throughput']), 2),
+                "packetLossRate": round(float(row['packet_loss_rate']), 4),
+                "congestionEvents": int(row['congestion_count']),
+                "totalSamples": int(row['total_samples']),
+                "isolated": link_fanout.get(link_name, 0) == 1
             })
         
         return jsonify({"cells": cell_stats})
@@ -280,6 +534,7 @@ def cell_stats():
 
 
 @app.route("/api/link-stats")
+@etag_cached
 def link_stats():
     """
     Get aggregated statistics per inferred link.
@@ -287,41 +542,39 @@ def link_stats():
     try:
         analysis = get_cached_analysis()
         df = analysis['df']
-        topology = analysis['topology']
-        
-        # Group cells by link
-        links = {}
-        for cell_id, link_name in topology.items():
-            if link_name not in links:
-                links[link_name] = []
-            links[link_name].append(cell_id)
+        links_to_cells = analysis['links_to_cells']
+        link_to_id = analysis['link_to_id']
+        
+        # Aggregate data for all cells of each link in one pass
+        stats = df.groupby('link', sort=False, observed=True).agg(
+            avg_throughput=('throughput', 'mean'),
+            total_packets=('throughput', 'sum'),
+            total_loss=('packet_loss', 'sum'),
+            congestion_events=('is_congested', 'sum')
+        ).to_dict(orient='index')
+        link_peak = analysis['link_peak']
         
         link_stats = []
-        for link_name in sorted(links.keys(), key=lambda x: int(x.split('_')[1])):
-            cells = links[link_name]
-            link_id = int(link_name.split('_')[1])
-            
-            # Aggregate data for all cells on this link
-            link_data = df[df['cell_id'].isin(cells)]
+        for link_name in sorted(links_to_cells, key=link_to_id.__getitem__):
+            cells = links_to_cells[link_name]
+            link_id = link_to_id[link_name]
+            link_data = stats[link_name]
             
-            avg_throughput = float(link_data['throughput'].mean())
-            peak_throughput = float(link_data.groupby('timestamp')['throughput'].sum().max())
-            total_loss = int(link_data['packet_loss'].sum())
-            total_packets = int(link_data['throughput'].sum())
+            total_loss = int(link_data['total_loss'])
+            total_packets = int(link_data['total_packets'])
             packet_loss_rate = (total_loss / total_packets * 100) if total_packets > 0 else 0
-            congestion_events = int(link_data['is_congested'].sum())
             
             isolated = len(cells) == 1
             
             link_stats.append({
                 "linkId": link_id,
                 "linkName": link_name,
-                "cells": sorted(cells, key=lambda x: int(x.split('_')[1])),
+                "cells": cells,
                 "cellCount": len(cells),
-                "avgThroughput": round(avg_throughput, 2),
-                "peakThroughput": round(peak_throughput, 2),
+                "avgThroughput": round(float(link_data['avg_throughput']), 2),
+                "peakThroughput": round(float(link_peak[link_name]), 2),
                 "packetLossRate": round(packet_loss_rate, 4),
-                "congestionEvents": congestion_events,
+                "congestionEvents": int(link_data['congestion_events']),
                 "isolated": isolated
             })
         
@@ -335,9 +588,25 @@ def link_stats():
 def correlation():
     """
     Get the full correlation matrix.
+    
+    Query params:
+        format (str): 'compact' returns the matrix as base64 of its row-major
+            float32 buffer plus row/column labels (default: nested dicts).
+            Both formats give 0 for a cell against itself
     """
     try:
         analysis = get_cached_analysis()
+        
+        if request.args.get('format') == 'compact':
+            matrix = analysis['corr_matrix']
+            return jsonify({
+                "labels": analysis['corr_labels'],
+                "shape": list(matrix.shape),
+                "dtype": "float32",
+                "data": base64.b64encode(matrix.tobytes()).decode('ascii'),
+                "topology": analysis['topology']
+            })
+        
         return jsonify({
             "correlation_matrix": analysis['correlation_matrix'],
             "topology": analysis['topology']
@@ -357,30 +626,32 @@ def timeseries(cell_id):
         analysis = get_cached_analysis()
         df = analysis['df']
         
-        cell_data = df[df['cell_id'] == cell_id].copy()
-        if cell_data.empty:
+        if cell_id not in df.index:
             return jsonify({"error": f"Cell {cell_id} not found"}), 404
+        cell_data = df.loc[cell_id:cell_id]
         
-        # Sort by timestamp
-        cell_data = cell_data.sort_values('timestamp')
+        # Rows are already sorted by timestamp in the cached dataframe
         
         # Sample every Nth point to keep response size manageable
         # Aim for ~500 data points
         total_points = len(cell_data)
         sample_rate = max(1, total_points // 500)
-        sampled = cell_data.iloc[::sample_rate]
+        
+        # Strided views over the needed columns only; no sampled frame is built
+        timestamps = cell_data['timestamp'].to_numpy()[::sample_rate].astype(np.float64)
+        throughput = cell_data['throughput'].to_numpy()[::sample_rate].astype(np.int64)
+        packet_loss = cell_data['packet_loss'].to_numpy()[::sample_rate].astype(np.int64)
+        congested = cell_data['is_congested'].to_numpy()[::sample_rate].astype(bool)
         
         # Normalize timestamps to start from 0
-        min_time = sampled['timestamp'].min()
+        times = np.round(timestamps - timestamps.min(), 3)
         
-        timeseries = []
-        for _, row in sampled.iterrows():
-            timeseries.append({
-                "time": round(float(row['timestamp'] - min_time), 3),
-                "throughput": int(row['throughput']),
-                "packetLoss": int(row['packet_loss']),
-                "congested": bool(row['is_congested'])
-            })
+        timeseries = [
+            {"time": t, "throughput": thr, "packetLoss": loss, "congested": cong}
+            for t, thr, loss, cong in zip(
+                times.tolist(), throughput.tolist(), packet_loss.tolist(), congested.tolist()
+            )
+        ]
         
         return jsonify({
             "cellId": cell_id,
@@ -405,41 +676,43 @@ def congestion_timeline():
         df = analysis['df']
         topology = analysis['topology']
         
-        # Get only congested rows
-        congested = df[df['is_congested'] == True].copy()
-        
-        # Group by time buckets (aggregate to reduce data size)
-        congested['time_bucket'] = (congested['timestamp'] // 0.1).astype(int) * 0.1
-        
-        # Count congestion events per cell per time bucket
-        grouped = congested.groupby(['time_bucket', 'cell_id']).size().reset_index(name='count')
-        
-        # Pivot to get cells as columns
-        timeline = {}
-        for _, row in grouped.iterrows():
-            t = round(float(row['time_bucket']), 1)
-            if t not in timeline:
-                timeline[t] = {}
-            timeline[t][row['cell_id']] = int(row['count'])
-        
-        # Convert to list format
-        result = []
-        for t in sorted(timeline.keys()):
-            entry = {"time": t, "cells": timeline[t]}
-            result.append(entry)
+        # Timestamps and cells of the congested rows only; cell_id is masked as
+        # a categorical, so only the congested rows' labels are materialized
+        congested = df['is_congested'].to_numpy(bool)
+        cells = df['cell_id'].array[congested]
+        
+        # Group by 100 ms time buckets (aggregate to reduce data size); integer
+        # bucket keys avoid the drift of flooring by the inexact float 0.1
+        time_bucket = (df['timestamp'].to_numpy()[congested] * 10).astype(np.int64)
+        
+        # Count congestion events per cell per time bucket, pivoted to get cells as columns
+        pivot = pd.Series(time_bucket).groupby([time_bucket, cells], observed=True).size().unstack(fill_value=0)
+        
+        # Stream the timeline one bucket at a time (buckets are already in time order),
+        # keeping only the cells that were congested in each bucket
+        def generate():
+            yield '{"timeline":['
+            sep = ''
+            for t, cells in pivot.to_dict(orient='index').items():
+                yield sep + app.json.dumps({
+                    "cells": {cell: int(n) for cell, n in cells.items() if n},
+                    "time": t / 10.0
+                })
+                sep = ','
+            yield '],"topology":'
+            yield app.json.dumps(topology)
+            yield '}'
         
-        return jsonify({
-            "timeline": result,
-            "topology": topology
-        })
+        return Response(stream_with_context(generate()), mimetype='application/json')
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 def get_cached_link_traffic():
-    """Get or compute cached link traffic data."""
-    if 'link_traffic' not in _cache:
+    """Get or compute cached link traffic data for the current contents of DATA_PATH."""
+    fingerprint = _current_fingerprint()
+    if _cache.get('link_traffic_fingerprint') != fingerprint or 'link_traffic' not in _cache:
         print("Loading throughput data for link traffic (this may take a while)...")
         
         # Get topology first
@@ -455,6 +728,7 @@ def get_cached_link_traffic():
         link_traffic_df['time_seconds'] = link_traffic_df['slot_id'] * SLOT_DURATION_SECONDS
         
         _cache['link_traffic'] = link_traffic_df
+        _cache['link_traffic_fingerprint'] = fingerprint
         print("Link traffic data cached.")
     
     return _cache['link_traffic']
@@ -510,14 +784,12 @@ def get_link_traffic(link_id):
         sampled_gbps = gbps_data[::sample_rate].tolist()
         
         # Get cells on this link
-        analysis = get_cached_analysis()
-        topology = analysis['topology']
-        cells = [cell for cell, link in topology.items() if link == link_name]
+        cells = get_cached_analysis()['links_to_cells'].get(link_name, [])
         
         return jsonify({
             "linkId": link_id,
             "linkName": link_name,
-            "cells": sorted(cells, key=lambda x: int(x.split('_')[1])),
+            "cells": cells,
             "duration": duration,
             "totalSlots": total_points,
             "sampledPoints": len(sampled_time),
@@ -542,19 +814,13 @@ def get_all_links_info():
     """
     try:
         analysis = get_cached_analysis()
-        topology = analysis['topology']
-        
-        # Group cells by link
-        links = {}
-        for cell_id, link_name in topology.items():
-            if link_name not in links:
-                links[link_name] = []
-            links[link_name].append(cell_id)
+        links_to_cells = analysis['links_to_cells']
+        link_to_id = analysis['link_to_id']
         
         result = []
-        for link_name in sorted(links.keys(), key=lambda x: int(x.split('_')[1])):
-            link_id = int(link_name.split('_')[1])
-            cells = sorted(links[link_name], key=lambda x: int(x.split('_')[1]))
+        for link_name in sorted(links_to_cells, key=link_to_id.__getitem__):
+            link_id = link_to_id[link_name]
+            cells = links_to_cells[link_name]
             result.append({
                 "linkId": link_id,
                 "linkName": link_name,
@@ -1396,10 +1662,12 @@ def capacity_recommendations():
         return jsonify({"error": str(e)}), 500
 
 
-# Cache for traffic data (avoid reloading on every capacity request)
+# Cache for traffic data (avoid reloading on every capacity request), rebuilt
+# when the data fingerprint it was built from changes
 _traffic_cache = {
     'link_traffic_df': None,
-    'topology': None
+    'topology': None,
+    'fingerprint': None
 }
 
 
@@ -1407,7 +1675,8 @@ def get_cached_traffic():
     """Load and cache traffic data for capacity optimization."""
     global _traffic_cache
     
-    if _traffic_cache['link_traffic_df'] is None:
+    fingerprint = _current_fingerprint()
+    if _traffic_cache['link_traffic_df'] is None or _traffic_cache['fingerprint'] != fingerprint:
         print("[Capacity] Loading traffic data into cache...")
         analysis = get_cached_analysis()
         topology = analysis['topology']
@@ -1418,6 +1687,7 @@ def get_cached_traffic():
         
         _traffic_cache['link_traffic_df'] = link_traffic_df
         _traffic_cache['topology'] = topology
+        _traffic_cache['fingerprint'] = fingerprint
         print(f"[Capacity] Cached {len(link_traffic_df)} slots of traffic data")
     
     return _traffic_cache['link_traffic_df'], _traffic_cache['topology']
@@ -0,0 +1,11 @@
+"""
+Gunicorn hooks for the backend (gunicorn reads this file from the working
+directory; workers, threads and binding are set on the start command).
+"""
+
+
+def post_fork(server, worker):
+    # Start the optional WARM_CACHE warm-up in the worker rather than in the
+    # --preload master, where the thread would not survive the fork
+    from app import start_cache_warmup
+    start_cache_warmup()
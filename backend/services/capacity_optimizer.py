@@ -24,15 +24,32 @@ Algorithm:
     5. Select lowest-cost tier that passes SLA
 """
 
-from typing import Dict, List, Tuple
+import hashlib
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .fifo_buffer import simulate_fifo_buffer
+
+# Numba is optional: when installed, the buffer recurrence runs as a compiled
+# loop. The kernel is serial on purpose: a parallel one starts a thread pool
+# that isn't safe across gunicorn --preload forks or concurrent request
+# threads. It releases the GIL instead, so request threads run it concurrently
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 
 # =============================================================================
 # CONSTANTS
 # =============================================================================
 
-# Capacity tiers in Gbps (ordered by cost, lowest first)
-CAPACITY_TIERS = [10, 25, 50]
+# Capacity tiers in Gbps (ordered by cost, lowest first; kept sorted for bisect)
+CAPACITY_TIERS = (10, 25, 50)
 
 # Cost indices (relative cost)
 TIER_COSTS = {10: 1.0, 25: 2.5, 50: 5.0}
@@ -43,6 +60,17 @@ BUFFER_SYMBOLS = 4          # Buffer size in symbols
 SYMBOLS_PER_SLOT = 14       # 14 symbols per slot
 SLOT_DURATION_US = 500      # 500 microseconds per slot
 
+# Unit conversions, precomputed (same arithmetic as gbps_to_bits_per_slot)
+BITS_PER_GBPS_SLOT = 1e9 * (SLOT_DURATION_US / 1e6)   # Bits per slot at 1 Gbps
+TIER_BITS_PER_SLOT = {t: t * 1e9 * (SLOT_DURATION_US / 1e6) for t in CAPACITY_TIERS}
+TIER_BUFFER_BITS = {t: TIER_BITS_PER_SLOT[t] * (BUFFER_SYMBOLS / SYMBOLS_PER_SLOT) for t in CAPACITY_TIERS}
+
+# Bounded LRU of evaluate_link results, keyed by link, traffic digest and SLA config.
+# Request threads share it, so every access holds _evaluation_cache_lock
+EVALUATION_CACHE_SIZE = 1024
+_evaluation_cache = OrderedDict()
+_evaluation_cache_lock = threading.Lock()
+
 
 # =============================================================================
 # CORE SIMULATION
@@ -58,64 +86,199 @@ def gbps_to_bits_per_slot(gbps: float) -> float:
     return gbps * 1e9 * (SLOT_DURATION_US / 1e6)
 
 
-def simulate_link(traffic_bits_per_slot: List[float], capacity_gbps: int) -> dict:
+if njit is not None:
+    @njit(cache=True, nogil=True, boundscheck=False)
+    def _simulate_links_kernel(traffic, capacities_bits, buffer_capacities):
+        """
+        Compiled FIFO loop over all links (rows of traffic) and tiers at once.
+        Capacities and buffers are tuples, so each tier count gets its own
+        specialization with a fixed-length tier loop.
+        """
+        n_links = traffic.shape[0]
+        n_tiers = len(capacities_bits)
+        traffic_slots = np.zeros(n_links, dtype=np.int64)
+        loss_slots = np.zeros((n_links, n_tiers), dtype=np.int64)
+        for link in range(n_links):
+            buffer_fill = np.zeros(n_tiers)
+            link_loss_slots = np.zeros(n_tiers, dtype=np.int64)
+            link_traffic_slots = 0
+            for i in range(traffic.shape[1]):
+                # Branchless update: empty slots arrive as 0 bits, so they only
+                # drain the buffer and can never overflow it
+                traffic_bits = max(traffic[link, i], 0.0)
+                link_traffic_slots += traffic_bits > 0
+                for k in range(n_tiers):
+                    fill = max(buffer_fill[k] + traffic_bits - capacities_bits[k], 0.0)
+                    link_loss_slots[k] += fill > buffer_capacities[k]
+                    buffer_fill[k] = min(fill, buffer_capacities[k])
+            traffic_slots[link] = link_traffic_slots
+            loss_slots[link] = link_loss_slots
+        return traffic_slots, loss_slots
+    
+    def _simulate_links_core(traffic, capacities_bits, buffer_capacities):
+        """
+        Simulate all links (rows of traffic) and tiers at once; returns
+        (traffic_slots per link, loss_slots per link and tier).
+        """
+        if len(capacities_bits) == 0:
+            # Every tier covers the peak: only the traffic slots are needed
+            return np.count_nonzero(traffic > 0, axis=1), np.zeros((traffic.shape[0], 0), dtype=np.int64)
+        return _simulate_links_kernel(
+            traffic, tuple(capacities_bits.tolist()), tuple(buffer_capacities.tolist())
+        )
+    
+    # Compile at import, for each number of standard tiers that can need
+    # simulating, so the first API request doesn't pay the JIT latency
+    for _n_tiers in range(1, len(CAPACITY_TIERS) + 1):
+        _simulate_links_kernel(np.zeros((1, 2), dtype=np.float32), (1.0,) * _n_tiers, (1.0,) * _n_tiers)
+else:
+    def _simulate_links_core(traffic, capacities_bits, buffer_capacities):
+        """
+        NumPy FIFO simulation of all links (rows of traffic) and tiers; returns
+        (traffic_slots per link, loss_slots per link and tier).
+        
+        Links are scanned one at a time (in bounded chunks): a single
+        (slots, links, tiers) block multiplies the scan's memory by the link
+        count and runs slower. Each link only scans the tiers below its own peak.
+        """
+        traffic = np.maximum(traffic, 0)
+        traffic_slots = np.count_nonzero(traffic > 0, axis=1)
+        loss_slots = np.zeros((traffic.shape[0], len(capacities_bits)), dtype=np.int64)
+        for link, link_traffic in enumerate(traffic):
+            simulated = np.flatnonzero(capacities_bits < link_traffic.max(initial=0.0))
+            if len(simulated):
+                loss_slots[link, simulated], _ = simulate_fifo_buffer(
+                    link_traffic, capacities_bits[simulated], buffer_capacities[simulated]
+                )
+        return traffic_slots, loss_slots
+
+
+def simulate_links_tiers(link_traffic: List[List[float]], capacities_gbps: List[int]) -> List[Dict[int, dict]]:
     """
-    Simulate traffic flow through a link with FIFO buffer.
+    Simulate several links through several capacities in one batch.
+    
+    Traces are stacked into a zero-padded (links, slots) float32 array (per-slot
+    traffic of ~1e7 bits needs no more precision; buffer fill is still
+    accumulated in float64). Padding slots carry no traffic, so they only
+    drain the buffer and never add traffic or loss slots; total_slots still
+    reports each link's own length.
     
     Args:
-        traffic_bits_per_slot: List of traffic in bits for each slot
-        capacity_gbps: Link capacity in Gbps
+        link_traffic: Traffic in bits for each slot, one trace per link
+        capacities_gbps: Link capacities in Gbps
         
     Returns:
-        Simulation results including loss percentage and SLA status
+        One mapping of capacity -> simulation results (see simulate_link) per link
+        
+    Raises:
+        ValueError: If any traffic value is NaN, infinite or overflows float32
     """
-    # Convert capacity to bits per slot
-    capacity_bits = gbps_to_bits_per_slot(capacity_gbps)
+    # Convert capacities to bits per slot (precomputed for the standard tiers)
+    capacities_bits = np.array([
+        TIER_BITS_PER_SLOT[c] if c in TIER_BITS_PER_SLOT else gbps_to_bits_per_slot(c)
+        for c in capacities_gbps
+    ])
     
     # Buffer can hold: capacity * (buffer_symbols / symbols_per_slot)
-    buffer_capacity = capacity_bits * (BUFFER_SYMBOLS / SYMBOLS_PER_SLOT)
-    
-    # Simulation state
-    buffer_fill = 0.0
-    loss_slots = 0
-    traffic_slots = 0  # Slots with actual traffic
-    
-    for traffic in traffic_bits_per_slot:
-        # Skip empty slots
-        if traffic <= 0:
-            # Drain buffer even in empty slots
-            buffer_fill = max(0, buffer_fill - capacity_bits)
-            continue
+    buffer_capacities = np.array([
+        TIER_BUFFER_BITS[c] if c in TIER_BUFFER_BITS else bits * (BUFFER_SYMBOLS / SYMBOLS_PER_SLOT)
+        for c, bits in zip(capacities_gbps, capacities_bits.tolist())
+    ])
+    
+    lengths = [len(traffic) for traffic in link_traffic]
+    traffic = np.zeros((len(link_traffic), max(lengths, default=0)), dtype=np.float32)
+    for row, trace in enumerate(link_traffic):
+        traffic[row, :len(trace)] = trace
+    if not np.isfinite(traffic).all():
+        raise ValueError("traffic per slot must be finite and within float32 range")
+    
+    # A capacity at or above every link's peak transmits each slot in full: the
+    # buffer never fills, so those tiers have zero loss without simulating them
+    peak_bits = float(traffic.max()) if traffic.size else 0.0
+    simulated = np.flatnonzero(capacities_bits < peak_bits)
+    
+    # Each slot adds its traffic, transmits up to capacity and drops the
+    # excess beyond the buffer; empty slots only drain it
+    traffic_slots, simulated_loss_slots = _simulate_links_core(
+        traffic, capacities_bits[simulated], buffer_capacities[simulated]
+    )
+    loss_slots = np.zeros((len(link_traffic), len(capacities_bits)), dtype=np.int64)
+    loss_slots[:, simulated] = simulated_loss_slots
+    
+    results = []
+    for total_slots, link_traffic_slots, link_loss_slots in zip(lengths, traffic_slots.tolist(), loss_slots.tolist()):
+        link_results = {}
+        for capacity_gbps, tier_loss_slots in zip(capacities_gbps, link_loss_slots):
+            # Calculate loss percentage over traffic-carrying slots only
+            loss_percent = (tier_loss_slots / link_traffic_slots * 100) if link_traffic_slots > 0 else 0.0
+            sla_pass = loss_percent <= SLA_MAX_LOSS_PERCENT
             
-        traffic_slots += 1
-        
-        # Add incoming traffic to buffer
-        buffer_fill += traffic
-        
-        # Transmit up to capacity
-        transmitted = min(buffer_fill, capacity_bits)
-        buffer_fill -= transmitted
-        
-        # Check for overflow (loss)
-        if buffer_fill > buffer_capacity:
-            loss_slots += 1
-            buffer_fill = buffer_capacity  # Excess is dropped
+            link_results[capacity_gbps] = {
+                "capacity_gbps": capacity_gbps,
+                "total_slots": total_slots,
+                "traffic_slots": link_traffic_slots,
+                "loss_slots": tier_loss_slots,
+                "loss_percent": loss_percent,
+                "sla_pass": sla_pass
+            }
+        results.append(link_results)
+    
+    return results
+
+
+def simulate_link_tiers(traffic_bits_per_slot: List[float], capacities_gbps: List[int]) -> Dict[int, dict]:
+    """
+    Simulate traffic flow through a link with FIFO buffer for several capacities
+    in a single pass over the traffic.
     
-    # Calculate loss percentage over traffic-carrying slots only
-    loss_percent = (loss_slots / traffic_slots * 100) if traffic_slots > 0 else 0.0
-    sla_pass = loss_percent <= SLA_MAX_LOSS_PERCENT
+    Args:
+        traffic_bits_per_slot: Traffic in bits for each slot (list or array)
+        capacities_gbps: Link capacities in Gbps
+        
+    Returns:
+        Mapping of capacity -> simulation results (see simulate_link)
+    """
+    return simulate_links_tiers([traffic_bits_per_slot], capacities_gbps)[0]
+
+
+def simulate_link(traffic_bits_per_slot: List[float], capacity_gbps: int) -> dict:
+    """
+    Simulate traffic flow through a link with FIFO buffer.
     
+    Args:
+        traffic_bits_per_slot: List of traffic in bits for each slot
+        capacity_gbps: Link capacity in Gbps
+        
+    Returns:
+        Simulation results including loss percentage (unrounded) and SLA status
+    """
+    return simulate_link_tiers(traffic_bits_per_slot, [capacity_gbps])[capacity_gbps]
+
+
+def _evaluation_key(link_id: str, cells: List[str], traffic: np.ndarray) -> tuple:
+    """Cache key for evaluate_link: link, hash of the float32 traffic, and everything the result depends on."""
+    digest = hashlib.blake2b(traffic.tobytes(), digest_size=16).digest()
+    return (
+        link_id, tuple(cells), len(traffic), digest,
+        CAPACITY_TIERS, BUFFER_SYMBOLS, SLA_MAX_LOSS_PERCENT
+    )
+
+
+def _copy_evaluation(result: dict) -> dict:
+    """Copy an evaluate_link result so callers can't modify the cached one."""
     return {
-        "capacity_gbps": capacity_gbps,
-        "total_slots": len(traffic_bits_per_slot),
-        "traffic_slots": traffic_slots,
-        "loss_slots": loss_slots,
-        "loss_percent": round(loss_percent, 2),
-        "sla_pass": sla_pass
+        **result,
+        "cells": list(result["cells"]),
+        "tier_evaluation": {t: dict(v) for t, v in result["tier_evaluation"].items()}
     }
 
 
-def evaluate_link(link_id: str, cells: List[str], traffic_bits_per_slot: List[float]) -> dict:
+def evaluate_link(
+    link_id: str,
+    cells: List[str],
+    traffic_bits_per_slot: List[float],
+    tier_results: Optional[Dict[int, dict]] = None
+) -> dict:
     """
     Evaluate all capacity tiers for a single link and recommend the best one.
     
@@ -123,22 +286,35 @@ def evaluate_link(link_id: str, cells: List[str], traffic_bits_per_slot: List[fl
         link_id: Link identifier
         cells: List of cell IDs connected to this link
         traffic_bits_per_slot: Aggregated traffic in bits per slot
+        tier_results: Optional precomputed simulate_link_tiers result for CAPACITY_TIERS
         
     Returns:
-        Complete evaluation with recommendation
+        Complete evaluation with recommendation, metrics unrounded (a copy of
+        the cached result)
     """
-    # Calculate traffic statistics
-    peak_bits = max(traffic_bits_per_slot) if traffic_bits_per_slot else 0
-    peak_gbps = peak_bits / gbps_to_bits_per_slot(1)  # Convert back to Gbps
+    # Convert once; the statistics and the simulation share the array
+    traffic = np.ascontiguousarray(traffic_bits_per_slot, dtype=np.float32)
+    
+    # Identical traces are evaluated once (repeated requests re-send the same traffic)
+    cache_key = _evaluation_key(link_id, cells, traffic)
+    with _evaluation_cache_lock:
+        cached = _evaluation_cache.get(cache_key)
+        if cached is not None:
+            _evaluation_cache.move_to_end(cache_key)
+    if cached is not None:
+        return _copy_evaluation(cached)
     
-    avg_bits = sum(traffic_bits_per_slot) / len(traffic_bits_per_slot) if traffic_bits_per_slot else 0
-    avg_gbps = avg_bits / gbps_to_bits_per_slot(1)
+    # Calculate traffic statistics (accumulating the mean in float64)
+    peak_bits = float(traffic.max()) if traffic.size else 0
+    avg_bits = float(traffic.mean(dtype=np.float64)) if traffic.size else 0
     
-    # Evaluate each tier
-    tier_results = {}
-    for tier in CAPACITY_TIERS:
-        result = simulate_link(traffic_bits_per_slot, tier)
-        tier_results[tier] = result
+    # Convert back to Gbps
+    peak_gbps = peak_bits / BITS_PER_GBPS_SLOT
+    avg_gbps = avg_bits / BITS_PER_GBPS_SLOT
+    
+    # Evaluate all tiers in one pass over the traffic
+    if tier_results is None:
+        tier_results = simulate_link_tiers(traffic, CAPACITY_TIERS)
     
     # Find lowest-cost tier that passes SLA
     recommended_tier = None
@@ -152,33 +328,31 @@ def evaluate_link(link_id: str, cells: List[str], traffic_bits_per_slot: List[fl
         recommended_tier = CAPACITY_TIERS[-1]
         reason = f"No tier meets SLA. Using {recommended_tier}G (highest available)."
     else:
-        loss = tier_results[recommended_tier]["loss_percent"]
+        loss = round(tier_results[recommended_tier]["loss_percent"], 2)
         if loss == 0:
             reason = f"Zero packet loss with {BUFFER_SYMBOLS}-symbol buffer"
         else:
             reason = f"Meets SLA with {loss}% loss (≤{SLA_MAX_LOSS_PERCENT}%)"
     
-    # Calculate what peak-based provisioning would choose
-    peak_based_tier = CAPACITY_TIERS[-1]  # Naive: always use 50G
-    for tier in CAPACITY_TIERS:
-        if tier >= peak_gbps:
-            peak_based_tier = tier
-            break
+    # Calculate what peak-based provisioning would choose: the smallest tier
+    # covering the peak, or 50G if none does
+    peak_tier_index = bisect_left(CAPACITY_TIERS, peak_gbps)
+    peak_based_tier = CAPACITY_TIERS[min(peak_tier_index, len(CAPACITY_TIERS) - 1)]
     
     # Cost savings vs peak-based
     rec_cost = TIER_COSTS[recommended_tier]
     peak_cost = TIER_COSTS[peak_based_tier]
     savings = ((peak_cost - rec_cost) / peak_cost * 100) if peak_cost > 0 else 0
     
-    return {
+    result = {
         "link_id": link_id,
-        "cells": cells,
-        "peak_traffic_gbps": round(peak_gbps, 2),
-        "avg_traffic_gbps": round(avg_gbps, 2),
+        "cells": list(cells),
+        "peak_traffic_gbps": peak_gbps,
+        "avg_traffic_gbps": avg_gbps,
         "recommended_tier": f"{recommended_tier}G",
         "recommended_tier_gbps": recommended_tier,
         "reason": reason,
-        "cost_savings_percent": round(max(0, savings), 0),
+        "cost_savings_percent": max(0, savings),
         "peak_based_tier": f"{peak_based_tier}G",
         "tier_evaluation": {
             f"{t}G": {
@@ -190,6 +364,42 @@ def evaluate_link(link_id: str, cells: List[str], traffic_bits_per_slot: List[fl
             for t in CAPACITY_TIERS
         }
     }
+    
+    with _evaluation_cache_lock:
+        _evaluation_cache[cache_key] = result
+        if len(_evaluation_cache) > EVALUATION_CACHE_SIZE:
+            _evaluation_cache.popitem(last=False)
+    
+    return _copy_evaluation(result)
+
+
+def _round_link_results(results: List[dict]) -> List[dict]:
+    """
+    Round the metrics of evaluate_link results for output, one vectorized
+    np.round per metric across all links. Returns new dicts; the (cached)
+    inputs are left untouched.
+    """
+    tier_names = [f"{t}G" for t in CAPACITY_TIERS]
+    peak = np.round([r["peak_traffic_gbps"] for r in results], 2).tolist()
+    avg = np.round([r["avg_traffic_gbps"] for r in results], 2).tolist()
+    savings = np.round([r["cost_savings_percent"] for r in results], 0).tolist()
+    loss = np.round(
+        [[r["tier_evaluation"][t]["loss_percent"] for t in tier_names] for r in results], 2
+    ).reshape(len(results), len(tier_names)).tolist()
+    
+    return [
+        {
+            **result,
+            "peak_traffic_gbps": link_peak,
+            "avg_traffic_gbps": link_avg,
+            "cost_savings_percent": link_savings,
+            "tier_evaluation": {
+                t: {**result["tier_evaluation"][t], "loss_percent": tier_loss}
+                for t, tier_loss in zip(tier_names, link_loss)
+            }
+        }
+        for result, link_peak, link_avg, link_savings, link_loss in zip(results, peak, avg, savings, loss)
+    ]
 
 
 def optimize_all_links(topology: Dict[str, str], link_traffic: Dict[str, List[float]]) -> dict:
@@ -204,32 +414,43 @@ def optimize_all_links(topology: Dict[str, str], link_traffic: Dict[str, List[fl
         Complete recommendations for all links
     """
     # Group cells by link
-    link_cells = {}
+    link_cells = defaultdict(list)
     for cell_id, link_id in topology.items():
-        if link_id not in link_cells:
-            link_cells[link_id] = []
         link_cells[link_id].append(cell_id)
     
+    # Links that carry traffic
+    link_ids = [
+        link_id for link_id in sorted(link_cells.keys())
+        if len(link_traffic.get(link_id, [])) > 0
+    ]
+    traffic = {link_id: np.ascontiguousarray(link_traffic[link_id], dtype=np.float32) for link_id in link_ids}
+    
+    # Simulate all links without a cached evaluation, and all tiers, in one batch
+    cache_keys = {
+        link_id: _evaluation_key(link_id, sorted(link_cells[link_id]), traffic[link_id])
+        for link_id in link_ids
+    }
+    with _evaluation_cache_lock:
+        uncached = [link_id for link_id in link_ids if cache_keys[link_id] not in _evaluation_cache]
+    batch_results = dict(zip(uncached, simulate_links_tiers([traffic[link_id] for link_id in uncached], CAPACITY_TIERS)))
+    
     # Evaluate each link
-    links = []
+    results = []
     total_rec_cost = 0
     total_peak_cost = 0
     
-    for link_id in sorted(link_cells.keys()):
+    for link_id in link_ids:
         cells = sorted(link_cells[link_id])
-        traffic = link_traffic.get(link_id, [])
-        
-        if not traffic:
-            continue
-            
-        result = evaluate_link(link_id, cells, traffic)
-        links.append(result)
+        result = evaluate_link(link_id, cells, traffic[link_id], batch_results.get(link_id))
+        results.append(result)
         
         # Accumulate costs
         total_rec_cost += TIER_COSTS[result["recommended_tier_gbps"]]
         peak_tier = int(result["peak_based_tier"].replace("G", ""))
         total_peak_cost += TIER_COSTS[peak_tier]
     
+    links = _round_link_results(results)
+    
     # Overall savings
     overall_savings = 0
     if total_peak_cost > 0:
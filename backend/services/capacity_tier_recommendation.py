@@ -22,25 +22,24 @@ Author: Nokia Hackathon Team
 Date: January 2026
 """
 
-import json
 import os
-from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from collections import defaultdict
+from dataclasses import dataclass, fields
 from typing import List, Dict, Optional, Tuple
-import pandas as pd
+import numpy as np
+import orjson
+
+# Slot timing (same values as services.capacity_estimation, defined here so
+# importing this module doesn't pull in pandas)
+SLOT_DURATION_SECONDS = 500e-6
+SYMBOLS_PER_SLOT = 14
+SYMBOL_DURATION_SECONDS = SLOT_DURATION_SECONDS / SYMBOLS_PER_SLOT
 
-# Import existing modules (non-destructive extension)
 try:
-    from services.capacity_estimation import (
-        simulate_buffer,
-        SLOT_DURATION_SECONDS,
-        SYMBOLS_PER_SLOT,
-        SYMBOL_DURATION_SECONDS
-    )
+    from services.fifo_buffer import simulate_fifo_buffer
 except ImportError:
-    # Fallback constants if import fails
-    SLOT_DURATION_SECONDS = 500e-6
-    SYMBOLS_PER_SLOT = 14
-    SYMBOL_DURATION_SECONDS = SLOT_DURATION_SECONDS / SYMBOLS_PER_SLOT
+    from fifo_buffer import simulate_fifo_buffer
 
 
 # =============================================================================
@@ -79,7 +78,10 @@ SLA_CONGESTION_TOLERANCE = 0.05                 # ≤ 5% congestion events (slot
 # Data Classes for Structured Output
 # =============================================================================
 
-@dataclass
+# Both classes are built in bulk and only read afterwards, so they are frozen and
+# slotted (slots=True also generates the pickle/copy support that frozen needs)
+
+@dataclass(frozen=True, slots=True)
 class TierEvaluation:
     """Evaluation result for a single capacity tier."""
     tier_name: str
@@ -91,7 +93,7 @@ class TierEvaluation:
     headroom_percent: float
     reason: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CapacityRecommendation:
     """Complete recommendation for a single fronthaul link."""
     link_id: str
@@ -107,6 +109,11 @@ class CapacityRecommendation:
     recommendation_reason: str
 
 
+def _fields_dict(obj) -> Dict:
+    """Shallow field-name -> value mapping for a slotted dataclass."""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
 # =============================================================================
 # Core Recommendation Logic
 # =============================================================================
@@ -136,8 +143,25 @@ def calculate_buffer_capacity_bits(capacity_gbps: float) -> float:
     return buffer_bits
 
 
+def traffic_gbps_to_bits(traffic_per_slot_gbps: List[float]) -> np.ndarray:
+    """
+    Convert a per-slot traffic series from Gbps to bits per slot.
+    
+    Each slot is 500 µs, so bits_per_slot = gbps * 1e9 * slot_duration. The
+    result is stored as float32 (the buffer simulation and sums accumulate in
+    float64).
+    
+    Args:
+        traffic_per_slot_gbps: Traffic demand per slot in Gbps
+    
+    Returns:
+        Traffic in bits per slot
+    """
+    return (np.asarray(traffic_per_slot_gbps, dtype=np.float64) * 1e9 * SLOT_DURATION_SECONDS).astype(np.float32)
+
+
 def simulate_link_performance(
-    traffic_per_slot_gbps: List[float],
+    traffic_bits_per_slot: np.ndarray,
     capacity_gbps: float,
     buffer_symbols: int = BUFFER_SYMBOLS
 ) -> Dict:
@@ -150,7 +174,7 @@ def simulate_link_performance(
     3. Packet loss when buffer overflows
     
     Args:
-        traffic_per_slot_gbps: Traffic demand per slot in Gbps
+        traffic_bits_per_slot: Traffic demand per slot in bits (see traffic_gbps_to_bits)
         capacity_gbps: Link capacity in Gbps
         buffer_symbols: Buffer size in symbols (default: 4)
     
@@ -162,65 +186,93 @@ def simulate_link_performance(
         - max_buffer_utilization: Peak buffer usage as fraction
         - avg_utilization: Average link utilization
     """
-    if not traffic_per_slot_gbps:
-        return {
-            "total_slots": 0,
-            "loss_slots": 0,
-            "loss_ratio": 0.0,
-            "max_buffer_utilization": 0.0,
-            "avg_utilization": 0.0
-        }
-    
-    # Convert to bits per slot for simulation
-    # Each slot is 500 µs, so bits_per_slot = gbps * slot_duration * 1e9
-    slot_duration_seconds = SLOT_DURATION_SECONDS
+    return simulate_link_performance_tiers(traffic_bits_per_slot, [capacity_gbps], buffer_symbols)[0]
+
+
+def simulate_link_performance_tiers(
+    traffic_bits_per_slot: np.ndarray,
+    capacities_gbps: List[float],
+    buffer_symbols: int = BUFFER_SYMBOLS
+) -> List[Dict]:
+    """
+    Simulate link performance under several capacity tiers in one pass.
     
-    # Capacity in bits per slot
-    capacity_bits_per_slot = capacity_gbps * 1e9 * slot_duration_seconds
+    Args:
+        traffic_bits_per_slot: Traffic demand per slot in bits (see traffic_gbps_to_bits)
+        capacities_gbps: Link capacities in Gbps
+        buffer_symbols: Buffer size in symbols (default: 4)
+    
+    Returns:
+        One simulate_link_performance result dictionary per capacity, in order
+    """
+    return simulate_links_performance_tiers([traffic_bits_per_slot], capacities_gbps, buffer_symbols)[0]
+
+
+def simulate_links_performance_tiers(
+    link_traffic_bits: List[np.ndarray],
+    capacities_gbps: List[float],
+    buffer_symbols: int = BUFFER_SYMBOLS
+) -> List[List[Dict]]:
+    """
+    Simulate several links under several capacity tiers.
+    
+    Every link/tier pair gets its own buffer. Links are scanned one at a time
+    (all tiers together, in bounded chunks), since a single (slots, links,
+    tiers) block multiplies the scan's memory by the link count.
+    
+    Args:
+        link_traffic_bits: Traffic demand per slot in bits, one trace per link
+        capacities_gbps: Link capacities in Gbps
+        buffer_symbols: Buffer size in symbols (default: 4)
+    
+    Returns:
+        Per link, one simulate_link_performance result dictionary per capacity
+    """
+    # Capacity in bits per slot, one entry per tier
+    # Each slot is 500 µs, so bits_per_slot = gbps * slot_duration * 1e9
+    capacity_bits_per_slot = np.asarray(capacities_gbps, dtype=np.float64) * 1e9 * SLOT_DURATION_SECONDS
     
     # Buffer capacity (based on buffer time relative to slot time)
     # Buffer can hold: capacity_bits_per_slot * (buffer_symbols / symbols_per_slot)
     buffer_size_bits = capacity_bits_per_slot * (buffer_symbols / SYMBOLS_PER_SLOT)
     
-    # Simulation state
-    buffer_occupancy = 0.0
-    loss_slots = 0
-    max_buffer_occupancy = 0.0
-    total_traffic = 0.0
-    
-    for traffic_gbps in traffic_per_slot_gbps:
-        # Convert traffic to bits per slot
-        traffic_bits = traffic_gbps * 1e9 * slot_duration_seconds
-        total_traffic += traffic_bits
-        
-        # Traffic arrives
-        total_bits = buffer_occupancy + traffic_bits
+    results = []
+    for traffic in link_traffic_bits:
+        # Traffic is stored as float32; the buffer simulation and sums
+        # accumulate in float64
+        traffic = np.asarray(traffic, dtype=np.float32)
+        total_slots = len(traffic)
+        total_traffic = float(traffic.sum(dtype=np.float64))
         
-        # Link transmits up to capacity
-        transmitted = min(total_bits, capacity_bits_per_slot)
-        remaining = total_bits - transmitted
+        # A capacity at or above the link's peak transmits each slot in full,
+        # so the buffer stays empty: only tiers below the peak need simulating
+        simulated = np.flatnonzero(capacity_bits_per_slot < traffic.max(initial=0.0))
+        loss_slots = np.zeros(len(capacities_gbps), dtype=np.int64)
+        max_buffer_occupancy = np.zeros(len(capacities_gbps))
         
-        # Check buffer overflow
-        if remaining > buffer_size_bits:
-            # Overflow: excess beyond buffer is lost
-            loss_slots += 1
-            buffer_occupancy = buffer_size_bits
-        else:
-            buffer_occupancy = remaining
+        if len(simulated):
+            # Traffic arrives, the link transmits up to capacity, and whatever
+            # overflows the buffer is lost (the buffer stays full); also
+            # tracks peak buffer usage
+            loss_slots[simulated], max_buffer_occupancy[simulated] = simulate_fifo_buffer(
+                traffic, capacity_bits_per_slot[simulated], buffer_size_bits[simulated]
+            )
         
-        # Track peak buffer usage
-        max_buffer_occupancy = max(max_buffer_occupancy, buffer_occupancy)
-    
-    total_slots = len(traffic_per_slot_gbps)
-    total_capacity = capacity_bits_per_slot * total_slots
-    
-    return {
-        "total_slots": total_slots,
-        "loss_slots": loss_slots,
-        "loss_ratio": loss_slots / total_slots if total_slots > 0 else 0.0,
-        "max_buffer_utilization": max_buffer_occupancy / buffer_size_bits if buffer_size_bits > 0 else 0.0,
-        "avg_utilization": total_traffic / total_capacity if total_capacity > 0 else 0.0
-    }
+        link_results = []
+        for capacity_bits, buffer_bits, tier_loss_slots, tier_max_occupancy in zip(
+            capacity_bits_per_slot.tolist(), buffer_size_bits.tolist(), loss_slots.tolist(), max_buffer_occupancy.tolist()
+        ):
+            total_capacity = capacity_bits * total_slots
+            link_results.append({
+                "total_slots": total_slots,
+                "loss_slots": tier_loss_slots,
+                "loss_ratio": tier_loss_slots / total_slots if total_slots > 0 else 0.0,
+                "max_buffer_utilization": tier_max_occupancy / buffer_bits if total_slots > 0 and buffer_bits > 0 else 0.0,
+                "avg_utilization": total_traffic / total_capacity if total_capacity > 0 else 0.0
+            })
+        results.append(link_results)
+    
+    return results
 
 
 def evaluate_capacity_tier(
@@ -229,7 +281,8 @@ def evaluate_capacity_tier(
     peak_traffic_gbps: float,
     avg_traffic_gbps: float,
     traffic_per_slot_gbps: Optional[List[float]] = None,
-    ml_congestion_risk: Optional[float] = None
+    ml_congestion_risk: Optional[float] = None,
+    sim_result: Optional[Dict] = None
 ) -> TierEvaluation:
     """
     Evaluate a single capacity tier against SLA constraints.
@@ -248,6 +301,7 @@ def evaluate_capacity_tier(
         avg_traffic_gbps: Average traffic
         traffic_per_slot_gbps: Optional time-series for simulation
         ml_congestion_risk: Optional ML-predicted risk score (0-1)
+        sim_result: Optional precomputed simulate_link_performance result for this tier
     
     Returns:
         TierEvaluation with pass/fail and metrics
@@ -274,7 +328,8 @@ def evaluate_capacity_tier(
     
     # Run simulation if time-series data is available
     if traffic_per_slot_gbps:
-        sim_result = simulate_link_performance(traffic_per_slot_gbps, capacity_gbps)
+        if sim_result is None:
+            sim_result = simulate_link_performance(traffic_gbps_to_bits(traffic_per_slot_gbps), capacity_gbps)
         estimated_packet_loss = sim_result["loss_ratio"]
         congestion_risk = sim_result["avg_utilization"]
     else:
@@ -319,9 +374,9 @@ def evaluate_capacity_tier(
         capacity_gbps=capacity_gbps,
         relative_cost=relative_cost,
         sla_pass=sla_pass,
-        estimated_packet_loss=round(estimated_packet_loss, 4),
-        congestion_risk=round(congestion_risk, 4),
-        headroom_percent=round(headroom_percent, 2),
+        estimated_packet_loss=estimated_packet_loss,
+        congestion_risk=congestion_risk,
+        headroom_percent=headroom_percent,
         reason=reason
     )
 
@@ -333,7 +388,8 @@ def recommend_capacity_tier(
     peak_traffic_gbps: float,
     avg_traffic_gbps: float,
     traffic_per_slot_gbps: Optional[List[float]] = None,
-    ml_congestion_risk: Optional[float] = None
+    ml_congestion_risk: Optional[float] = None,
+    sim_results: Optional[Dict[str, Dict]] = None
 ) -> CapacityRecommendation:
     """
     Generate cost-optimized capacity recommendation for a fronthaul link.
@@ -352,10 +408,27 @@ def recommend_capacity_tier(
         avg_traffic_gbps: Average aggregated traffic
         traffic_per_slot_gbps: Optional time-series for detailed simulation
         ml_congestion_risk: Optional ML-predicted congestion probability
+        sim_results: Optional precomputed simulate_link_performance results by tier name
+            (tiers left out are evaluated without a simulation)
     
     Returns:
         CapacityRecommendation with full tier analysis and recommendation
     """
+    # Simulate every tier that can carry the peak in a single pass over the traffic
+    # (tiers below peak traffic fail without simulation)
+    if sim_results is None:
+        simulated_tiers = [
+            tier_name for tier_name, tier_info in CAPACITY_TIERS.items()
+            if tier_info["capacity_gbps"] >= peak_traffic_gbps
+        ] if traffic_per_slot_gbps else []
+        sim_results = {}
+        if simulated_tiers:
+            # Convert the series to bits once; every simulated tier shares it
+            sim_results = dict(zip(simulated_tiers, simulate_link_performance_tiers(
+                traffic_gbps_to_bits(traffic_per_slot_gbps),
+                [CAPACITY_TIERS[tier_name]["capacity_gbps"] for tier_name in simulated_tiers]
+            )))
+    
     # Evaluate all tiers
     tier_evaluations: Dict[str, TierEvaluation] = {}
     
@@ -366,7 +439,8 @@ def recommend_capacity_tier(
             peak_traffic_gbps=peak_traffic_gbps,
             avg_traffic_gbps=avg_traffic_gbps,
             traffic_per_slot_gbps=traffic_per_slot_gbps,
-            ml_congestion_risk=ml_congestion_risk
+            ml_congestion_risk=ml_congestion_risk,
+            sim_result=sim_results.get(tier_name)
         )
         tier_evaluations[tier_name] = evaluation
     
@@ -402,13 +476,13 @@ def recommend_capacity_tier(
         link_id=link_id,
         link_name=link_name,
         cells=cells,
-        peak_traffic_gbps=round(peak_traffic_gbps, 2),
-        avg_traffic_gbps=round(avg_traffic_gbps, 2),
-        tier_evaluations={k: asdict(v) for k, v in tier_evaluations.items()},
+        peak_traffic_gbps=peak_traffic_gbps,
+        avg_traffic_gbps=avg_traffic_gbps,
+        tier_evaluations={k: _fields_dict(v) for k, v in tier_evaluations.items()},
         recommended_tier=recommended_tier_name,
         recommended_capacity_gbps=CAPACITY_TIERS[recommended_tier_name]["capacity_gbps"],
-        cost_savings_percent=round(cost_savings_percent, 1),
-        ml_congestion_risk=round(ml_congestion_risk, 4) if ml_congestion_risk else None,
+        cost_savings_percent=cost_savings_percent,
+        ml_congestion_risk=ml_congestion_risk if ml_congestion_risk else None,
         recommendation_reason=recommendation_reason
     )
 
@@ -431,9 +505,35 @@ def generate_capacity_recommendations(
     Returns:
         List of CapacityRecommendation objects
     """
+    # Simulate links with a traffic series in batches, one per set of tiers
+    # that can carry the link's peak (tiers below peak traffic fail without
+    # simulation, as in recommend_capacity_tier)
+    links_by_tiers = defaultdict(list)
+    for i, link in enumerate(link_data):
+        if link.get("traffic_per_slot_gbps"):
+            peak_traffic = link.get("peakTraffic", link.get("peak_traffic_gbps", 0))
+            simulated_tiers = tuple(
+                tier_name for tier_name, tier_info in CAPACITY_TIERS.items()
+                if tier_info["capacity_gbps"] >= peak_traffic
+            )
+            links_by_tiers[simulated_tiers].append(i)
+    
+    link_sim_results = {}
+    for simulated_tiers, simulated_links in links_by_tiers.items():
+        if not simulated_tiers:
+            # No tier carries the peak: every tier fails without simulation
+            link_sim_results.update((i, {}) for i in simulated_links)
+            continue
+        batch_results = simulate_links_performance_tiers(
+            [traffic_gbps_to_bits(link_data[i]["traffic_per_slot_gbps"]) for i in simulated_links],
+            [CAPACITY_TIERS[tier_name]["capacity_gbps"] for tier_name in simulated_tiers]
+        )
+        for i, results in zip(simulated_links, batch_results):
+            link_sim_results[i] = dict(zip(simulated_tiers, results))
+    
     recommendations = []
     
-    for link in link_data:
+    for i, link in enumerate(link_data):
         link_id = str(link.get("linkId", link.get("link_id", "")))
         link_name = link.get("linkName", link.get("link_name", f"Link_{link_id}"))
         cells = link.get("cells", [])
@@ -453,7 +553,8 @@ def generate_capacity_recommendations(
             peak_traffic_gbps=peak_traffic,
             avg_traffic_gbps=avg_traffic,
             traffic_per_slot_gbps=traffic_series,
-            ml_congestion_risk=ml_risk
+            ml_congestion_risk=ml_risk,
+            sim_results=link_sim_results.get(i)
         )
         
         recommendations.append(recommendation)
@@ -461,6 +562,52 @@ def generate_capacity_recommendations(
     return recommendations
 
 
+def summarize_recommendations(
+    recommendations: List[CapacityRecommendation]
+) -> Tuple[Dict[str, int], float]:
+    """
+    Summarize recommendations: links per recommended tier and average cost savings.
+    
+    Shared by save_recommendations_to_file and the command-line summary.
+    
+    Args:
+        recommendations: List of CapacityRecommendation objects
+    
+    Returns:
+        (tier_counts, average_cost_savings)
+    """
+    tier_counts = {tier_name: 0 for tier_name in CAPACITY_TIERS}
+    total_savings = 0.0
+    
+    for rec in recommendations:
+        tier_counts[rec.recommended_tier] += 1
+        total_savings += rec.cost_savings_percent
+    
+    average_cost_savings = total_savings / len(recommendations) if recommendations else 0.0
+    
+    return tier_counts, average_cost_savings
+
+
+def _round_floats(value, ndigits: int):
+    """
+    Recursively round every float in a JSON-like structure of dicts and lists.
+    
+    Args:
+        value: Dict, list, float or any other JSON value
+        ndigits: Decimal places to keep
+    
+    Returns:
+        Copy of the structure with floats rounded (other values unchanged)
+    """
+    if isinstance(value, float):
+        return round(value, ndigits)
+    if isinstance(value, dict):
+        return {k: _round_floats(v, ndigits) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round_floats(v, ndigits) for v in value]
+    return value
+
+
 def save_recommendations_to_file(
     recommendations: List[CapacityRecommendation],
     output_path: str = "data/capacity_recommendations.json"
@@ -481,7 +628,7 @@ def save_recommendations_to_file(
     # Convert to serializable format
     output = {
         "metadata": {
-            "generated_at": pd.Timestamp.now().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "sla_packet_loss_threshold": SLA_PACKET_LOSS_THRESHOLD,
             "buffer_symbols": BUFFER_SYMBOLS,
             "buffer_time_us": BUFFER_TIME_US,
@@ -495,24 +642,24 @@ def save_recommendations_to_file(
         "recommendations": []
     }
     
-    # Calculate summary statistics
-    tier_counts = {"10G": 0, "25G": 0, "50G": 0}
-    total_savings = 0.0
-    
-    for rec in recommendations:
-        rec_dict = asdict(rec)
-        output["recommendations"].append(rec_dict)
-        tier_counts[rec.recommended_tier] += 1
-        total_savings += rec.cost_savings_percent
+    # Recommendations are flat apart from tier_evaluations, which already holds
+    # plain dicts, so a shallow copy is enough for serialization
+    output["recommendations"] = [_fields_dict(rec) for rec in recommendations]
     
+    # Calculate summary statistics
+    tier_counts, average_cost_savings = summarize_recommendations(recommendations)
     output["summary"]["tier_distribution"] = tier_counts
-    output["summary"]["average_cost_savings"] = round(
-        total_savings / len(recommendations) if recommendations else 0, 1
-    )
+    output["summary"]["average_cost_savings"] = average_cost_savings
+    
+    # Values are kept at full precision internally; trim them once for the file
+    output = _round_floats(output, 4)
     
     # Save to file
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(
+            output,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
     
     return output_path
 
@@ -566,6 +713,7 @@ if __name__ == "__main__":
     ml_predictions_path = "data/congestion_predictions.csv"
     if os.path.exists(ml_predictions_path):
         try:
+            import pandas as pd
             ml_df = pd.read_csv(ml_predictions_path)
             if "link_id" in ml_df.columns and "congestion_probability" in ml_df.columns:
                 # Get latest prediction per link
@@ -583,13 +731,7 @@ if __name__ == "__main__":
     print("CAPACITY TIER RECOMMENDATIONS")
     print("-" * 60)
     
-    tier_counts = {"10G": 0, "25G": 0, "50G": 0}
-    total_savings = 0.0
-    
     for rec in recommendations:
-        tier_counts[rec.recommended_tier] += 1
-        total_savings += rec.cost_savings_percent
-        
         print(f"\n{rec.link_name} ({len(rec.cells)} cells)")
         print(f"  Peak Traffic: {rec.peak_traffic_gbps:.2f} Gbps")
         print(f"  Recommended:  {rec.recommended_tier} ({rec.recommended_capacity_gbps} Gbps)")
@@ -597,13 +739,15 @@ if __name__ == "__main__":
         print(f"  Reason: {rec.recommendation_reason}")
     
     # Print overall summary
+    tier_counts, average_cost_savings = summarize_recommendations(recommendations)
+    
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
     print(f"\nTier Distribution:")
     for tier, count in tier_counts.items():
         print(f"  {tier}: {count} links")
-    print(f"\nAverage Cost Savings: {total_savings / len(recommendations):.1f}%")
+    print(f"\nAverage Cost Savings: {average_cost_savings:.1f}%")
     print(f"(compared to peak-based 50G provisioning)")
     
     # Save to file
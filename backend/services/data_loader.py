@@ -14,6 +14,7 @@ All validation is deterministic and produces clear, readable error messages.
 
 import os
 import pandas as pd
+from pandas.api.types import union_categoricals
 
 from .raw_data_parser import load_raw_data
 
@@ -21,13 +22,57 @@ from .raw_data_parser import load_raw_data
 # Required columns for fronthaul traffic analysis
 REQUIRED_COLUMNS = ["timestamp", "cell_id", "throughput", "packet_loss"]
 
+# Rows parsed per chunk when reading CSV input (bounds the parser's peak memory)
+CSV_CHUNKSIZE = 200_000
+
+
+def read_csv_chunked(csv_path: str, chunksize: int = CSV_CHUNKSIZE) -> pd.DataFrame:
+    """
+    Read a traffic CSV file in chunks, keeping only the required columns.
+    
+    Each chunk is parsed with a categorical cell_id and downcast numeric
+    columns before being concatenated, so the full file is never held as
+    wide object/int64 columns. Chunk categories are unified first so that
+    cell_id stays categorical after concatenation.
+    
+    Args:
+        csv_path (str): Path to the CSV file.
+        chunksize (int): Number of rows parsed per chunk.
+    
+    Returns:
+        pd.DataFrame: Required columns present in the file, compactly typed.
+    """
+    reader = pd.read_csv(
+        csv_path,
+        usecols=lambda col: col in REQUIRED_COLUMNS,
+        dtype={"cell_id": "category"},
+        chunksize=chunksize
+    )
+    
+    chunks = []
+    for chunk in reader:
+        for col in ("throughput", "packet_loss"):
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], downcast="unsigned")
+        chunks.append(chunk)
+    
+    if not chunks:
+        return pd.read_csv(csv_path, usecols=lambda col: col in REQUIRED_COLUMNS)
+    
+    if "cell_id" in chunks[0].columns and len(chunks) > 1:
+        categories = union_categoricals([chunk["cell_id"] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk["cell_id"] = chunk["cell_id"].cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True)
+
 
 def load_data(data_path: str) -> pd.DataFrame:
     """
     Load and validate 5G fronthaul traffic data.
     
     Supports two data sources:
-    1. CSV file: Single file with all data
+    1. CSV file: Single file with all data (read in chunks, see read_csv_chunked)
     2. Directory: Folder containing raw .dat files from hackathon dataset
     
     This function performs validation steps:
@@ -63,7 +108,7 @@ def load_data(data_path: str) -> pd.DataFrame:
         df = load_raw_data(data_path)
     else:
         # Load from CSV file
-        df = pd.read_csv(data_path)
+        df = read_csv_chunked(data_path)
     
     # Step 3: Validate required columns
     missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
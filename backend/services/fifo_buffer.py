@@ -0,0 +1,188 @@
+"""
+FIFO Buffer Model
+=================
+Vectorized form of the leaf-switch buffer recurrence shared by the
+capacity simulators.
+
+Kept free of optional compiled dependencies so it can be imported both
+as part of the services package and by the standalone scripts.
+
+Run `python -m services.fifo_buffer` from backend/ to check the scan
+against the sequential recurrence (and the compiled kernel, if numba is
+installed).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Slots per block of the prefix scan: the scan costs log2(SCAN_BLOCK_SLOTS)
+# passes over the trace instead of log2(len(trace)), and each block's arrays
+# stay cache-sized
+SCAN_BLOCK_SLOTS = 256
+
+# Slots per call of fifo_buffer_fill in simulate_fifo_buffer, bounding the
+# scan's temporaries for long traces
+SIMULATION_CHUNK_SLOTS = 1 << 16
+
+
+def fifo_buffer_fill(delta: np.ndarray, buffer_capacity, initial_fill=0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run the FIFO buffer recurrence for every slot without a per-slot Python loop.
+    
+    The buffer starts at initial_fill (empty by default) and evolves as
+        fill[i] = min(max(fill[i-1] + delta[i], 0), buffer_capacity)
+    where delta is arriving traffic minus link capacity. Each step is a
+    clamp x -> clamp(x + s, lo, hi), and clamps compose into clamps:
+        g(f(x)) = clamp(x + s1 + s2, clamp(lo1 + s2, lo2, hi2), clamp(hi1 + s2, lo2, hi2))
+    The slots are split into blocks of SCAN_BLOCK_SLOTS; a log-step prefix
+    scan composes the clamps within every block at once, then the fill at
+    each block boundary is carried forward block by block.
+    
+    The scan sums deltas in a different order than the sequential loop, so
+    fills can differ from it in the last few bits; the clamps (and therefore
+    overflow decisions away from exact ties) are the same.
+    
+    Args:
+        delta: Traffic minus capacity per slot, along axis 0 (extra axes,
+            e.g. one column per tier, are simulated independently)
+        buffer_capacity: Buffer size in bits (scalar, or broadcastable to delta[0])
+        initial_fill: Buffer fill before the first slot, e.g. the last fill of
+            the previous chunk when a long trace is simulated in pieces
+    
+    Returns:
+        (fill, overflow): buffer fill after each slot, and a mask of the slots
+        where the buffer overflowed (fill before clamping exceeded the buffer)
+    """
+    delta = np.asarray(delta, dtype=np.float64)
+    n_slots = len(delta)
+    if n_slots == 0:
+        return np.zeros_like(delta), np.zeros(delta.shape, dtype=bool)
+    
+    # (blocks, slots per block, ...), zero-padded at the end
+    block_slots = min(SCAN_BLOCK_SLOTS, n_slots)
+    n_blocks = -(-n_slots // block_slots)
+    shift_total = np.zeros((n_blocks * block_slots,) + delta.shape[1:])
+    shift_total[:n_slots] = delta
+    shift_total = shift_total.reshape((n_blocks, block_slots) + delta.shape[1:])
+    lower = np.zeros_like(shift_total)
+    upper = np.broadcast_to(np.asarray(buffer_capacity, dtype=np.float64), shift_total.shape).copy()
+    
+    # Compose each slot's clamp with the prefix ending `step` slots earlier
+    step = 1
+    while step < block_slots:
+        s2, lo2, hi2 = shift_total[:, step:], lower[:, step:], upper[:, step:]
+        new_lower = np.clip(lower[:, :-step] + s2, lo2, hi2)
+        new_upper = np.clip(upper[:, :-step] + s2, lo2, hi2)
+        shift_total[:, step:] = shift_total[:, :-step] + s2
+        lower[:, step:] = new_lower
+        upper[:, step:] = new_upper
+        step *= 2
+    
+    # Fill entering each block: the previous block's full clamp applied to
+    # the fill entering it (the first block starts at initial_fill)
+    start = np.zeros((n_blocks,) + delta.shape[1:])
+    start[0] = initial_fill
+    for block in range(1, n_blocks):
+        start[block] = np.clip(
+            start[block - 1] + shift_total[block - 1, -1], lower[block - 1, -1], upper[block - 1, -1]
+        )
+    
+    # Apply every prefix to its block's starting fill
+    fill = np.clip(start[:, None] + shift_total, lower, upper)
+    fill = fill.reshape((n_blocks * block_slots,) + delta.shape[1:])[:n_slots]
+    
+    previous = np.empty_like(fill)
+    previous[0] = initial_fill
+    previous[1:] = fill[:-1]
+    overflow = previous + delta > buffer_capacity
+    
+    return fill, overflow
+
+
+def simulate_fifo_buffer(
+    traffic: np.ndarray,
+    capacities_bits: np.ndarray,
+    buffer_capacities: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate one traffic trace through a FIFO buffer per capacity.
+    
+    The trace is scanned in chunks of SIMULATION_CHUNK_SLOTS, each chunk
+    starting from the previous chunk's final fill, so memory stays bounded
+    however long the trace is.
+    
+    Args:
+        traffic: Traffic in bits per slot (1-D, non-negative)
+        capacities_bits: Link capacity in bits per slot, one entry per tier
+        buffer_capacities: Buffer size in bits, one entry per tier
+        
+    Returns:
+        (loss_slots, max_fill): per tier, the number of slots where the buffer
+        overflowed and the peak buffer fill
+    """
+    capacities_bits = np.asarray(capacities_bits, dtype=np.float64)
+    loss_slots = np.zeros(len(capacities_bits), dtype=np.int64)
+    max_fill = np.zeros(len(capacities_bits))
+    buffer_fill = np.zeros(len(capacities_bits))
+    for start in range(0, len(traffic), SIMULATION_CHUNK_SLOTS):
+        chunk = np.asarray(traffic[start:start + SIMULATION_CHUNK_SLOTS], dtype=np.float64)
+        fill, overflow = fifo_buffer_fill(chunk[:, None] - capacities_bits, buffer_capacities, buffer_fill)
+        loss_slots += np.count_nonzero(overflow, axis=0)
+        np.maximum(max_fill, fill.max(axis=0), out=max_fill)
+        buffer_fill = fill[-1]
+    return loss_slots, max_fill
+
+
+if __name__ == "__main__":
+    # Equivalence check: the scan against the sequential recurrence and, when
+    # numba is installed, the compiled kernel of the capacity optimizer
+    try:
+        from services.capacity_optimizer import _simulate_links_core, njit
+    except ImportError:
+        njit = None
+    
+    def sequential_fill(delta, buffer_capacity):
+        fill = np.zeros_like(delta)
+        overflow = np.zeros(delta.shape, dtype=bool)
+        previous = np.zeros(delta.shape[1:])
+        for i in range(len(delta)):
+            unclamped = np.maximum(previous + delta[i], 0)
+            overflow[i] = unclamped > buffer_capacity
+            previous = fill[i] = np.minimum(unclamped, buffer_capacity)
+        return fill, overflow
+    
+    rng = np.random.default_rng(0)
+    capacities = np.array([5e6, 12.5e6, 25e6])
+    buffers = capacities * (4 / 14)
+    traces = [np.zeros(0, dtype=np.float32), np.zeros(3000, dtype=np.float32)]
+    for _ in range(300):
+        n_slots = int(rng.integers(1, 5000))
+        trace = rng.exponential(rng.choice([2e6, 5e6, 1e7, 2e7]), n_slots)
+        trace[rng.random(n_slots) < rng.random()] = 0
+        traces.append(trace.astype(np.float32))
+    for _ in range(20):
+        # Traffic hovering at the 10G capacity keeps the buffer partly full
+        # across block boundaries, so the carried fill matters
+        n_slots = int(rng.integers(2000, 5000))
+        trace = capacities[0] + rng.normal(0, 2e3, n_slots)
+        trace[0] += buffers[0] / 2
+        traces.append(trace.astype(np.float32))
+    
+    mismatches = 0
+    for trace in traces:
+        delta = trace.astype(np.float64)[:, None] - capacities
+        fill, overflow = fifo_buffer_fill(delta, buffers)
+        expected_fill, expected_overflow = sequential_fill(delta, buffers)
+        loss_slots = np.count_nonzero(overflow, axis=0)
+        if not (np.array_equal(overflow, expected_overflow)
+                and np.allclose(fill, expected_fill, rtol=0, atol=1e-3)):
+            mismatches += 1
+        elif njit is not None:
+            _, kernel_loss_slots = _simulate_links_core(trace[None, :], capacities, buffers)
+            if not np.array_equal(kernel_loss_slots[0], loss_slots):
+                mismatches += 1
+    
+    checked = "sequential loop and numba kernel" if njit is not None else "sequential loop"
+    print(f"fifo_buffer_fill vs {checked}: {len(traces)} traces, {mismatches} mismatches")
+    raise SystemExit(1 if mismatches else 0)
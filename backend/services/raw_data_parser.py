@@ -170,14 +170,25 @@ def load_all_pkt_stats(data_dir: str) -> pd.DataFrame:
     if not files:
         raise FileNotFoundError(f"No pkt-stats files found in {data_dir}")
     
+    # Extract cell IDs from filenames (e.g., "pkt-stats-cell-1.dat" -> "cell_1")
+    cell_ids = [
+        f"cell_{os.path.basename(filepath).replace('pkt-stats-cell-', '').replace('.dat', '')}"
+        for filepath in files
+    ]
+    
+    # Every file's cell_id shares one category set, so it stays categorical
+    # after concatenation
+    cell_dtype = pd.CategoricalDtype(sorted(set(cell_ids)))
+    
     all_data = []
-    for filepath in files:
-        # Extract cell ID from filename (e.g., "pkt-stats-cell-1.dat" -> "cell_1")
-        filename = os.path.basename(filepath)
-        cell_num = filename.replace('pkt-stats-cell-', '').replace('.dat', '')
-        cell_id = f"cell_{cell_num}"
-        
+    for filepath, cell_id in zip(files, cell_ids):
         df = parse_pkt_stats_file(filepath, cell_id)
+        
+        # Compact each file's columns before concatenating, so the combined
+        # frame is never held as object/int64 columns
+        df['cell_id'] = df['cell_id'].astype(cell_dtype)
+        for col in ('txPackets', 'rxPackets', 'tooLateRxPackets', 'packet_loss'):
+            df[col] = pd.to_numeric(df[col], downcast='unsigned')
         all_data.append(df)
     
     combined = pd.concat(all_data, ignore_index=True)